@@ -1,7 +1,37 @@
+import sys
+from collections.abc import Generator, Iterator
+from itertools import count
+
 import psycopg2
 from psycopg2.extras import DictCursor
 
 
+# Server-side cursors need a name that is unique within the session
+_cursor_ids = count(1)
+
+
+class RowIterator: # {{{
+  """Rows of an executed cursor, as returned by DBConnector.execute_query_iter
+  and execute_query_stream.
+  close() closes the cursor directly: closing a generator that never started
+  skips its finally block, which would leave the cursor open.
+  """
+
+  def __init__(self, cur, rows: Generator[dict, None, None]) -> None:
+    self._cur = cur
+    self._rows = rows
+
+  def __iter__(self) -> Iterator[dict]:
+    # Hand out the generator itself, so iteration has no per-row wrapper call
+    return self._rows
+
+  def close(self) -> None:
+    """Stop iterating and release the cursor; safe to call more than once."""
+    self._rows.close()
+    self._cur.close()
+# }}}
+
+
 class DBConnector: # {{{
   """Manages a single PostgreSQL connection with query execution."""
 
@@ -33,6 +63,59 @@ class DBConnector: # {{{
       cur.execute(sql, params if params is not None else ())
       return cur.fetchall()
 
+  def execute_query_iter(self, sql: str, params: tuple | list | None = None
+                         ) -> tuple[RowIterator, int]:
+    """Execute a SELECT query and return (row iterator, total row count).
+    This is a client-side cursor: execute() already transfers the whole result
+    into client memory, which is what makes the total known. Only the
+    conversion to dicts is lazy, so callers that display the first few rows
+    never build the rest. For exports, use execute_query_stream instead.
+    """
+    if not self.conn:
+      raise RuntimeError("Not connected to database")
+    cur = self.conn.cursor()
+    try:
+      cur.execute(sql, params if params is not None else ())
+    except Exception:
+      cur.close()
+      raise
+    return RowIterator(cur, self._iter_rows(cur)), cur.rowcount
+
+  def execute_query_stream(self, sql: str, params: tuple | list | None = None,
+                           batch_size: int = 1000) -> RowIterator:
+    """Execute a SELECT query on a server-side cursor and return its rows.
+    Rows are fetched from the server batch_size at a time, so only one batch
+    is ever held in client memory; the total row count is not known upfront.
+    """
+    if not self.conn:
+      raise RuntimeError("Not connected to database")
+    cur = self.conn.cursor(name=f"gazer_stream_{next(_cursor_ids)}")
+    cur.itersize = batch_size
+    try:
+      cur.execute(sql, params if params is not None else ())
+    except Exception:
+      cur.close()
+      raise
+    return RowIterator(cur, self._iter_rows(cur))
+
+  @staticmethod
+  def _iter_rows(cur) -> Generator[dict, None, None]:
+    """Yield rows from an executed cursor as plain dicts, then close it.
+    Keys are interned once, so every row dict shares the same key objects.
+    """
+    try:
+      rows = iter(cur)
+      first = next(rows, None)
+      if first is None:
+        return
+      # A server-side cursor has no description until the first fetch
+      keys = tuple(sys.intern(d.name) for d in cur.description)
+      yield dict(zip(keys, first))
+      for row in rows:
+        yield dict(zip(keys, row))
+    finally:
+      cur.close()
+
   def execute_command(self, sql: str, params: tuple | list | None = None) -> int:
     """Execute INSERT/UPDATE/DELETE and return rowcount."""
     if not self.conn:
@@ -1,25 +1,50 @@
 import csv
+import os
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain
+
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB, so large exports flush in few syscalls
 
 
 # CSV Export {{{
-def export_csv(rows: list[dict], filepath: str) -> int:
+def export_csv(rows: Iterable[dict], filepath: str,
+               is_cancelled: Callable[[], bool] | None = None) -> int | None:
   """Export query results to a CSV file.
+  Rows are streamed straight to the writer, so a lazy row iterator is
+  never materialized in memory.
   Args:
-    rows: list of plain dicts (already converted from DictCursor rows)
+    rows: plain dicts (already converted from DictCursor rows), all with the same keys
     filepath: path to write the CSV to
+    is_cancelled: checked before each row; once it returns True, writing stops
   Returns:
-    number of rows written
+    number of rows written, or None if cancelled (the partial file is removed)
   """
-  if not rows:
+  rows = iter(rows)
+  first = next(rows, None)
+  if first is None:
     return 0
 
-  fieldnames = list(rows[0].keys())
+  fieldnames = list(first.keys())
+  written = 0
+  cancelled = False
+
+  def values() -> Iterator:
+    nonlocal written, cancelled
+    for row in chain([first], rows):
+      if is_cancelled is not None and is_cancelled():
+        cancelled = True
+        return
+      written += 1
+      yield row.values()
 
-  with open(filepath, 'w', newline='') as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in rows:
-      writer.writerow(row)
+  with open(filepath, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+    writer = csv.writer(f)
+    writer.writerow(fieldnames)
+    writer.writerows(values())
 
-  return len(rows)
+  if cancelled:
+    os.remove(filepath)
+    return None
+  return written
 # }}}
@@ -1,8 +1,60 @@
+from collections.abc import Iterable
 from typing import Any
 
 from .core_connect import DBConnector
 
 
+# Column metadata with PK/FK flags; {table_filter} optionally narrows to one table
+_COLUMNS_QUERY = """
+  SELECT
+      c.table_name,
+      c.column_name,
+      c.data_type,
+      c.is_nullable,
+      c.column_default,
+      c.udt_name,
+      -- Check if it's a primary key
+      CASE WHEN pk.column_name IS NOT NULL THEN true ELSE false END as is_primary_key,
+      -- Check if it's a foreign key
+      CASE WHEN fk.column_name IS NOT NULL THEN true ELSE false END as is_foreign_key,
+      -- Get foreign key reference if it exists
+      fk.foreign_table_name,
+      fk.foreign_column_name
+  FROM information_schema.columns c
+  -- Join to get primary key info (pg_catalog, like the FK join below)
+  LEFT JOIN (
+      SELECT cl.relname AS table_name, att.attname AS column_name
+      FROM pg_constraint con
+      JOIN pg_class cl ON con.conrelid = cl.oid
+      JOIN pg_namespace ns ON cl.relnamespace = ns.oid
+      JOIN pg_attribute att ON att.attrelid = con.conrelid
+          AND att.attnum = ANY(con.conkey)
+      WHERE con.contype = 'p'
+          AND ns.nspname = %s
+  ) pk ON c.table_name = pk.table_name AND c.column_name = pk.column_name
+  -- Join to get foreign key info (uses pg_catalog, visible to all users)
+  LEFT JOIN (
+      SELECT
+          cl.relname AS table_name,
+          att.attname AS column_name,
+          cl_foreign.relname AS foreign_table_name,
+          att_foreign.attname AS foreign_column_name
+      FROM pg_constraint con
+      JOIN pg_class cl ON con.conrelid = cl.oid
+      JOIN pg_namespace ns ON cl.relnamespace = ns.oid
+      JOIN pg_attribute att ON att.attrelid = con.conrelid
+          AND att.attnum = ANY(con.conkey)
+      JOIN pg_class cl_foreign ON con.confrelid = cl_foreign.oid
+      JOIN pg_attribute att_foreign ON att_foreign.attrelid = con.confrelid
+          AND att_foreign.attnum = ANY(con.confkey)
+      WHERE con.contype = 'f'
+          AND ns.nspname = %s
+  ) fk ON c.table_name = fk.table_name AND c.column_name = fk.column_name
+  WHERE c.table_schema = %s {table_filter}
+  ORDER BY c.table_name, c.ordinal_position
+"""
+
+
 class SchemaInspector: # {{{
   """Introspects PostgreSQL schema: tables, columns, enums, foreign keys.
   Uses in-memory caching to avoid repeated DB queries.
@@ -37,57 +89,23 @@ class SchemaInspector: # {{{
       self._cache[cache_key] = self.fetch_columns(table_name)
     return self._cache[cache_key]
 
+  def get_all_columns(self) -> dict[str, list[dict]]:
+    """Get column metadata for every table in the schema, keyed by table.
+    Fetched in one query; also fills the per-table cache used by get_columns.
+    """
+    if 'all_columns' not in self._cache:
+      all_columns = self.fetch_all_columns()
+      for table_name, columns in all_columns.items():
+        self._cache[f'columns_{table_name}'] = columns
+      self._cache['all_columns'] = all_columns
+    return self._cache['all_columns']
+
   def fetch_columns(self, table_name: str) -> list[dict]:
     """Fetch column metadata for a table.
     Raises RuntimeError with a clean message if the query fails.
     """
     schema = self.schema
-    query = """
-      SELECT
-          c.column_name,
-          c.data_type,
-          c.is_nullable,
-          c.column_default,
-          c.udt_name,
-          -- Check if it's a primary key
-          CASE WHEN pk.column_name IS NOT NULL THEN true ELSE false END as is_primary_key,
-          -- Check if it's a foreign key
-          CASE WHEN fk.column_name IS NOT NULL THEN true ELSE false END as is_foreign_key,
-          -- Get foreign key reference if it exists
-          fk.foreign_table_name,
-          fk.foreign_column_name
-      FROM information_schema.columns c
-      -- Join to get primary key info
-      LEFT JOIN (
-          SELECT ku.table_name, ku.column_name
-          FROM information_schema.table_constraints tc
-          JOIN information_schema.key_column_usage ku
-              ON tc.constraint_name = ku.constraint_name
-              AND tc.table_schema = ku.table_schema
-          WHERE tc.constraint_type = 'PRIMARY KEY'
-              AND tc.table_schema = %s
-      ) pk ON c.table_name = pk.table_name AND c.column_name = pk.column_name
-      -- Join to get foreign key info (uses pg_catalog, visible to all users)
-      LEFT JOIN (
-          SELECT
-              cl.relname AS table_name,
-              att.attname AS column_name,
-              cl_foreign.relname AS foreign_table_name,
-              att_foreign.attname AS foreign_column_name
-          FROM pg_constraint con
-          JOIN pg_class cl ON con.conrelid = cl.oid
-          JOIN pg_namespace ns ON cl.relnamespace = ns.oid
-          JOIN pg_attribute att ON att.attrelid = con.conrelid
-              AND att.attnum = ANY(con.conkey)
-          JOIN pg_class cl_foreign ON con.confrelid = cl_foreign.oid
-          JOIN pg_attribute att_foreign ON att_foreign.attrelid = con.confrelid
-              AND att_foreign.attnum = ANY(con.confkey)
-          WHERE con.contype = 'f'
-              AND ns.nspname = %s
-      ) fk ON c.table_name = fk.table_name AND c.column_name = fk.column_name
-      WHERE c.table_schema = %s AND c.table_name = %s
-      ORDER BY c.ordinal_position
-    """
+    query = _COLUMNS_QUERY.format(table_filter="AND c.table_name = %s")
     try:
       results = self.connector.execute_query_raw(
         query, (schema, schema, schema, table_name)
@@ -96,24 +114,41 @@ class SchemaInspector: # {{{
       raise RuntimeError(
         f"Failed to fetch columns for '{table_name}': {e}"
       ) from e
+    return [self._column_from_row(row) for row in results]
 
-    columns: list[dict] = []
+  def fetch_all_columns(self) -> dict[str, list[dict]]:
+    """Fetch column metadata for all tables in the schema with one query.
+    Raises RuntimeError with a clean message if the query fails.
+    """
+    schema = self.schema
+    query = _COLUMNS_QUERY.format(table_filter="")
+    try:
+      results = self.connector.execute_query_raw(query, (schema, schema, schema))
+    except Exception as e:
+      raise RuntimeError(f"Failed to fetch columns: {e}") from e
+
+    all_columns: dict[str, list[dict]] = {}
     for row in results:
-      col: dict[str, Any] = {
-        'name': row['column_name'],
-        'type': row['data_type'],
-        'nullable': row['is_nullable'] == 'YES',
-        'default': row['column_default'],
-        'udt_name': row['udt_name'],  # User-defined type (for enums)
-        'is_primary_key': row['is_primary_key'],
-        'is_foreign_key': row['is_foreign_key'],
-      }
-      # Add foreign key reference if exists
-      if row['is_foreign_key']:
-        col['fk_table'] = row['foreign_table_name']
-        col['fk_column'] = row['foreign_column_name']
-      columns.append(col)
-    return columns
+      all_columns.setdefault(row['table_name'], []).append(self._column_from_row(row))
+    return all_columns
+
+  @staticmethod
+  def _column_from_row(row: Any) -> dict[str, Any]:
+    """Convert one row of _COLUMNS_QUERY into a column metadata dict."""
+    col: dict[str, Any] = {
+      'name': row['column_name'],
+      'type': row['data_type'],
+      'nullable': row['is_nullable'] == 'YES',
+      'default': row['column_default'],
+      'udt_name': row['udt_name'],  # User-defined type (for enums)
+      'is_primary_key': row['is_primary_key'],
+      'is_foreign_key': row['is_foreign_key'],
+    }
+    # Add foreign key reference if exists
+    if row['is_foreign_key']:
+      col['fk_table'] = row['foreign_table_name']
+      col['fk_column'] = row['foreign_column_name']
+    return col
   # }}}
 
   # Enums {{{
@@ -134,6 +169,33 @@ class SchemaInspector: # {{{
     results = self.connector.execute_query_raw(query, (enum_type_name,))
     return [row['enumlabel'] for row in results]
 
+  def get_enum_values_many(self, enum_type_names: Iterable[str]) -> dict[str, list[str]]:
+    """Get values for several enum types, fetching all uncached ones in one query."""
+    names = list(dict.fromkeys(enum_type_names))
+    missing = [name for name in names if f'enum_{name}' not in self._cache]
+    if missing:
+      fetched = self.fetch_enum_values_many(missing)
+      for name in missing:
+        self._cache[f'enum_{name}'] = fetched.get(name, [])
+    return {name: self._cache[f'enum_{name}'] for name in names}
+
+  def fetch_enum_values_many(self, enum_type_names: list[str]) -> dict[str, list[str]]:
+    """Fetch values for many enum types at once, keyed by type name.
+    Types that are not enums are absent from the result.
+    """
+    query = """
+        SELECT t.typname, e.enumlabel
+        FROM pg_type t
+        JOIN pg_enum e ON t.oid = e.enumtypid
+        WHERE t.typname = ANY(%s)
+        ORDER BY t.typname, e.enumsortorder
+    """
+    results = self.connector.execute_query_raw(query, (enum_type_names,))
+    values: dict[str, list[str]] = {}
+    for row in results:
+      values.setdefault(row['typname'], []).append(row['enumlabel'])
+    return values
+
   def get_table_enums(self, table_name: str) -> dict[str, list[str]]:
     """Get all enum columns for a table with their possible values."""
     columns = self.get_columns(table_name)
@@ -181,6 +243,57 @@ class SchemaInspector: # {{{
     ]
   # }}}
 
+  # Fingerprint {{{
+  def fetch_fingerprint(self) -> str:
+    """Fetch a cheap hash that changes whenever the schema's catalog rows do.
+    Covers relations, columns, types, constraints and enum labels: any DDL on
+    them rewrites the catalog row, giving it a new xmin. Columns and types need
+    their own terms, since e.g. renaming either leaves pg_class untouched.
+    """
+    query = """
+      SELECT md5(
+        coalesce((
+          SELECT string_agg(cl.oid::text || ':' || cl.xmin::text, ',' ORDER BY cl.oid)
+          FROM pg_class cl
+          JOIN pg_namespace ns ON cl.relnamespace = ns.oid
+          WHERE ns.nspname = %s
+        ), '') || '|' ||
+        coalesce((
+          SELECT string_agg(
+            att.attrelid::text || ':' || att.attnum::text || ':' || att.xmin::text, ','
+            ORDER BY att.attrelid, att.attnum
+          )
+          FROM pg_attribute att
+          JOIN pg_class cl ON att.attrelid = cl.oid
+          JOIN pg_namespace ns ON cl.relnamespace = ns.oid
+          WHERE ns.nspname = %s
+              AND att.attnum > 0
+        ), '') || '|' ||
+        coalesce((
+          SELECT string_agg(t.oid::text || ':' || t.xmin::text, ',' ORDER BY t.oid)
+          FROM pg_type t
+          JOIN pg_namespace ns ON t.typnamespace = ns.oid
+          WHERE ns.nspname = %s
+              OR t.typtype = 'e'
+        ), '') || '|' ||
+        coalesce((
+          SELECT string_agg(con.oid::text || ':' || con.xmin::text, ',' ORDER BY con.oid)
+          FROM pg_constraint con
+          JOIN pg_namespace ns ON con.connamespace = ns.oid
+          WHERE ns.nspname = %s
+        ), '') || '|' ||
+        coalesce((
+          SELECT string_agg(e.oid::text || ':' || e.xmin::text, ',' ORDER BY e.oid)
+          FROM pg_enum e
+        ), '')
+      ) AS fingerprint
+    """
+    results = self.connector.execute_query_raw(
+      query, (self.schema, self.schema, self.schema, self.schema)
+    )
+    return results[0]['fingerprint']
+  # }}}
+
   # Utils {{{
   def refresh_cache(self, scope: str | None = None) -> None:
     """Refresh cached schema information.
@@ -192,7 +305,10 @@ class SchemaInspector: # {{{
     elif scope == 'tables':
       self._cache = {k: v for k, v in self._cache.items() if not k.startswith('tables')}
     elif scope == 'columns':
-      self._cache = {k: v for k, v in self._cache.items() if not k.startswith('columns_')}
+      self._cache = {
+        k: v for k, v in self._cache.items()
+        if not k.startswith('columns_') and k != 'all_columns'
+      }
     elif scope == 'enums':
       self._cache = {k: v for k, v in self._cache.items() if not k.startswith('enum_')}
   # }}}
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass, field
+from itertools import count
 from typing import Any
 
 
@@ -14,10 +15,15 @@ ALLOWED_OPERATORS = {
 
 ALLOWED_JOIN_TYPES = {"INNER", "LEFT", "RIGHT", "FULL"}
 
+# Source of QueryBuilder section versions; unique across builders and resets
+_versions = count(1)
+
 
 # Filter {{{
 @dataclass
 class Filter:
+  is_group = False  # Class attribute, not a field; cheaper to test than isinstance
+
   column: str
   operator: str
   value: Any = None
@@ -84,6 +90,8 @@ class Filter:
 # FilterGroup {{{
 @dataclass
 class FilterGroup:
+  is_group = True
+
   logic: str = "AND"
   children: list[Filter | FilterGroup] = field(default_factory=list)
 
@@ -132,6 +140,10 @@ class QueryBuilder:
     self.reset()
 
   def reset(self) -> QueryBuilder:
+    # Bumped whenever a section changes, so the UI can skip unchanged panels
+    self._select_version = next(_versions)   # Columns and DISTINCT
+    self._filter_version = next(_versions)
+    self._order_version = next(_versions)
     self._table: str | None = None
     self._columns: list[str] = []
     self._joins: list[dict] = []
@@ -174,6 +186,7 @@ class QueryBuilder:
 
     if full_column not in self._columns:
       self._columns.append(full_column)
+      self._select_version = next(_versions)
     return self
 
   def add_columns(self, *columns: str | tuple[str, str]) -> QueryBuilder:
@@ -187,6 +200,7 @@ class QueryBuilder:
   def remove_column(self, column_name: str) -> QueryBuilder:
     if column_name in self._columns:
       self._columns.remove(column_name)
+      self._select_version = next(_versions)
     return self
 
   def add_join(self, table: str, on_clause: str, join_type: str = 'INNER') -> QueryBuilder:
@@ -227,10 +241,12 @@ class QueryBuilder:
 
     f = Filter(full_column, operator, value)
     self._root_group.add(f)
+    self._filter_version = next(_versions)
     return self
 
   def add_filter_group(self, group: FilterGroup) -> QueryBuilder:
     self._root_group.add(group)
+    self._filter_version = next(_versions)
     return self
 
   def get_root_group(self) -> FilterGroup:
@@ -240,14 +256,17 @@ class QueryBuilder:
     children = self._root_group.children
     if 0 <= index < len(children):
       children.pop(index)
+      self._filter_version = next(_versions)
     return self
 
   def clear_filters(self) -> QueryBuilder:
     self._root_group = FilterGroup("AND")
+    self._filter_version = next(_versions)
     return self
 
   def toggle_distinct(self) -> QueryBuilder:
     self._distinct = not self._distinct
+    self._select_version = next(_versions)
     return self
 
   def add_order_by(self, column: str, direction: str = "ASC") -> QueryBuilder:
@@ -258,10 +277,12 @@ class QueryBuilder:
       if entry["column"] == column:
         return self
     self._order_by.append({"column": column, "direction": direction})
+    self._order_version = next(_versions)
     return self
 
   def clear_order_by(self) -> QueryBuilder:
     self._order_by = []
+    self._order_version = next(_versions)
     return self
   # }}}
 
@@ -396,6 +417,8 @@ class QueryBuilder:
       'root_group': self._root_group,
       'distinct': self._distinct,
       'order_by': self._order_by.copy(),
+      # (select, filter, order) section versions; equal means unchanged
+      'versions': (self._select_version, self._filter_version, self._order_version),
     }
 
   def __repr__(self) -> str:
@@ -1,9 +1,11 @@
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 
 
 CACHE_FILE = Path.home() / ".gazer" / "schema_cache.json"
+SCHEMA_DATA_FILE = Path.home() / ".gazer" / "schema_data.json"
 
 
 # Save / Load {{{
@@ -36,3 +38,58 @@ def load_cache(host: str, database: str) -> list[dict] | None:
     pass
   return None
 # }}}
+
+
+# Schema data {{{
+def save_schema_data(host: str, port: str, database: str, user: str, schema: str,
+                     fingerprint: str, schema_data: list[dict],
+                     enum_values: dict[str, list[str]]) -> None:
+  """Save introspected tables/columns and enum values to the schema data file.
+  Written to a temp file and swapped in, so a crash never leaves a partial cache.
+  """
+  data = {
+    "host": host,
+    "port": port,
+    "database": database,
+    "user": user,
+    "schema": schema,
+    "fingerprint": fingerprint,
+    "timestamp": datetime.now().isoformat(),
+    "schema_data": schema_data,
+    "enum_values": enum_values,
+  }
+  SCHEMA_DATA_FILE.parent.mkdir(exist_ok=True)
+  tmp_file = SCHEMA_DATA_FILE.with_suffix(".json.tmp")
+  with open(tmp_file, 'w') as f:
+    json.dump(data, f)
+  os.replace(tmp_file, SCHEMA_DATA_FILE)
+
+
+def load_schema_data(host: str, port: str, database: str, user: str,
+                     schema: str) -> dict | None:
+  """Load cached schema data if it matches the given connection and schema.
+  The user is part of the key: information_schema only lists the columns
+  they have privileges on, which the fingerprint does not capture.
+  Returns:
+    dict or None: with 'fingerprint', 'schema_data' and 'enum_values' keys
+    if the cache is valid, None otherwise.
+  """
+  if not SCHEMA_DATA_FILE.exists():
+    return None
+  try:
+    with open(SCHEMA_DATA_FILE, 'r') as f:
+      data = json.load(f)
+    if not isinstance(data, dict):
+      return None
+    if (data.get("host") == host and data.get("port") == port
+        and data.get("database") == database and data.get("user") == user
+        and data.get("schema") == schema):
+      return {
+        "fingerprint": data["fingerprint"],
+        "schema_data": data["schema_data"],
+        "enum_values": data["enum_values"],
+      }
+  except (OSError, ValueError, KeyError):
+    pass
+  return None
+# }}}
@@ -1,21 +1,54 @@
 from __future__ import annotations
 
+import sys
+from bisect import bisect_left
+from heapq import nsmallest
+from itertools import islice
+from collections.abc import Iterable, Mapping
 from enum import Enum, auto
+from types import MappingProxyType
 
 from textual.widgets import Input, OptionList
 
 
 # Constants {{{
+_OPERATOR_NAMES = {
+  "numeric": ("=", "!=", "<", ">", "<=", ">=", "BETWEEN", "IN", "IS NULL", "IS NOT NULL"),
+  "text":    ("=", "!=", "LIKE", "ILIKE", "NOT LIKE", "NOT ILIKE", "IN", "IS NULL", "IS NOT NULL"),
+  "bool":    ("=", "IS NULL", "IS NOT NULL"),
+  "enum":    ("=", "!=", "IN", "IS NULL", "IS NOT NULL"),
+  "date":    ("=", "!=", "<", ">", "<=", ">=", "BETWEEN", "IS NULL", "IS NOT NULL"),
+}
 # Operator suggestions by column type category
+# (multi-word operators are not interned automatically by the compiler)
 OPERATORS_BY_TYPE = {
-  "numeric": ["=", "!=", "<", ">", "<=", ">=", "BETWEEN", "IN", "IS NULL", "IS NOT NULL"],
-  "text":    ["=", "!=", "LIKE", "ILIKE", "NOT LIKE", "NOT ILIKE", "IN", "IS NULL", "IS NOT NULL"],
-  "bool":    ["=", "IS NULL", "IS NOT NULL"],
-  "enum":    ["=", "!=", "IN", "IS NULL", "IS NOT NULL"],
-  "date":    ["=", "!=", "<", ">", "<=", ">=", "BETWEEN", "IS NULL", "IS NOT NULL"],
+  category: tuple(sys.intern(op) for op in ops) for category, ops in _OPERATOR_NAMES.items()
+}
+
+
+def _index_by_first_char(words: Iterable[str]) -> dict[str, tuple[tuple[str, str], ...]]:
+  """Bucket (folded, original) pairs by first folded character, in order.
+  The "" bucket holds every pair, for empty input.
+  """
+  buckets: dict[str, list[tuple[str, str]]] = {"": []}
+  for word in words:
+    pair = (word.casefold(), word)
+    buckets[""].append(pair)
+    buckets.setdefault(pair[0][:1], []).append(pair)
+  return {key: tuple(pairs) for key, pairs in buckets.items()}
+
+
+# Operator pairs by category, then by first folded character
+_OPERATOR_INDEX = {
+  category: _index_by_first_char(ops) for category, ops in OPERATORS_BY_TYPE.items()
 }
 
+# (folded, original) pairs for the other fixed suggestion lists
+_BOOL_FOLDED = (("true", "true"), ("false", "false"))
+_DIRECTION_FOLDED = (("asc", "ASC"), ("desc", "DESC"))
+
 # Map PostgreSQL udt_name to type category
+# (udt names from the schema are interned at load, as are these literal keys)
 TYPE_CATEGORIES = {
   "int2": "numeric", "int4": "numeric", "int8": "numeric",
   "float4": "numeric", "float8": "numeric", "numeric": "numeric",
@@ -32,6 +65,98 @@ class DropdownStage(Enum):
   OPERATOR = auto()   # Choosing a filter operator
   VALUE = auto()      # Choosing/entering a filter value
   DIRECTION = auto()  # Choosing ORDER BY direction (ASC/DESC)
+
+
+def _filter_prefix(pairs: Iterable[tuple[str, str]], prefix: str) -> list[str]:
+  """Return originals whose case-folded form starts with the (folded) prefix.
+  Args:
+    pairs: (folded, original) pairs, in display order
+    prefix: already case-folded prefix to match
+  Comparing the first character rejects most candidates before startswith.
+  """
+  if not prefix:
+    return [orig for _, orig in pairs]
+  first = prefix[0]
+  return [
+    orig for folded, orig in pairs
+    if folded and folded[0] == first and folded.startswith(prefix)
+  ]
+# }}}
+
+
+class PrefixIndex: # {{{
+  """Case-folded names sorted for O(log n + k) prefix lookups.
+  Matches are returned in their original display order, not sorted order.
+  """
+
+  def __init__(self, pairs: Iterable[tuple[str, str]]) -> None:
+    """pairs: (folded, original) pairs, in display order."""
+    entries = sorted((folded, pos, orig) for pos, (folded, orig) in enumerate(pairs))
+    self._keys: tuple[str, ...] = tuple(e[0] for e in entries)
+    self._positions: tuple[int, ...] = tuple(e[1] for e in entries)
+    self._values: tuple[str, ...] = tuple(e[2] for e in entries)
+    self._in_order: tuple[str, ...] = tuple(
+      orig for _, orig in sorted(zip(self._positions, self._values))
+    )
+
+  def match(self, prefix: str, limit: int | None = None) -> list[str]:
+    """Return names whose folded form starts with the (folded) prefix.
+    With a limit, only the first `limit` names in display order are returned.
+    """
+    if not prefix:
+      return list(self._in_order[:limit])
+    keys = self._keys
+    start = end = bisect_left(keys, prefix)
+    while end < len(keys) and keys[end].startswith(prefix):
+      end += 1
+    position = self._positions.__getitem__
+    if limit is not None and end - start > limit:
+      hits = nsmallest(limit, range(start, end), key=position)
+    else:
+      hits = sorted(range(start, end), key=position)
+    return [self._values[i] for i in hits]
+# }}}
+
+
+class SchemaIndex: # {{{
+  """Read-only schema lookups for dropdown suggestions.
+  Built once per schema load and shared by every dropdown on a screen.
+  All names are interned, values are stored as tuples behind read-only
+  mappings, and case-folded forms are computed here rather than on every
+  keystroke.
+  """
+
+  def __init__(self, table_columns: Mapping[str, Iterable[str]],
+               column_lookup: Mapping[str, Iterable[str]],
+               column_types: Mapping[str, str] | None = None,
+               enum_values: Mapping[str, Iterable[str]] | None = None) -> None:
+    intern = sys.intern
+    self.table_columns: Mapping[str, tuple[str, ...]] = MappingProxyType({
+      intern(t): tuple(intern(c) for c in cols) for t, cols in table_columns.items()
+    })
+    self.column_lookup: Mapping[str, tuple[str, ...]] = MappingProxyType({
+      intern(c): tuple(intern(t) for t in tables) for c, tables in column_lookup.items()
+    })
+    # "table.column" -> udt_name
+    self.column_types: Mapping[str, str] = MappingProxyType({
+      intern(k): intern(v) for k, v in (column_types or {}).items()
+    })
+    # udt_name -> enum values
+    self.enum_values: Mapping[str, tuple[str, ...]] = MappingProxyType({
+      intern(t): tuple(intern(v) for v in values) for t, values in (enum_values or {}).items()
+    })
+
+    # Sorted prefix indices for table names and bare column names
+    self.table_index = PrefixIndex((intern(t.casefold()), t) for t in self.table_columns)
+    self.column_index = PrefixIndex((intern(c.casefold()), c) for c in self.column_lookup)
+    # Case-folded (folded, original) enum value pairs per udt_name, in sort order
+    self.enum_values_folded: Mapping[str, tuple[tuple[str, str], ...]] = MappingProxyType({
+      t: tuple((intern(v.casefold()), v) for v in values) for t, values in self.enum_values.items()
+    })
+    # Prefix index over each table's own columns
+    self.column_index_by_table: Mapping[str, PrefixIndex] = MappingProxyType({
+      t: PrefixIndex((intern(c.casefold()), c) for c in cols) for t, cols in self.table_columns.items()
+    })
 # }}}
 
 
@@ -45,32 +170,32 @@ class Dropdown(OptionList): # {{{
   """
   can_focus = False
 
+  MAX_SUGGESTIONS = 50  # Options shown at once; typing more narrows the rest
+
   def __init__(self, mode: str = "select", **kwargs) -> None:
     super().__init__(**kwargs)
     self.mode = mode
     self.stage: DropdownStage = DropdownStage.TABLE
-    self._suppress: bool = False
+    self._suppressed_text: str | None = None  # Programmatic fill to ignore once
+    # (stage, picked type, text) of the options currently shown
+    self._last_update_key: tuple[DropdownStage, str, str] | None = None
 
-    # Schema data (set via set_schema)
-    self._table_columns: dict[str, list[str]] = {}
-    self._column_lookup: dict[str, list[str]] = {}
-    self._column_types: dict[str, str] = {}   # "table.column" -> udt_name
-    self._enum_values: dict[str, list[str]] = {}  # udt_name -> [values]
+    # Schema data (set via set_schema, shared with other dropdowns)
+    self._schema: SchemaIndex = SchemaIndex({}, {})
 
     # Filter construction state (filter mode only)
     self._picked_column: str = ""       # "table.column"
     self._picked_type: str = ""         # udt_name
     self._picked_operator: str = ""
+    self._progress_text: str = ""       # Updated on stage transitions
 
-  def set_schema(self, table_columns: dict[str, list[str]],
-                 column_lookup: dict[str, list[str]],
-                 column_types: dict[str, str] | None = None,
-                 enum_values: dict[str, list[str]] | None = None) -> None:
-    """Provide schema data for suggestions."""
-    self._table_columns = table_columns
-    self._column_lookup = column_lookup
-    self._column_types = column_types or {}
-    self._enum_values = enum_values or {}
+  def set_schema(self, schema: SchemaIndex) -> None:
+    """Provide schema data for suggestions.
+    The index is stored by reference, not copied; it is shared with the
+    other dropdowns and must not be mutated afterwards.
+    """
+    self._schema = schema
+    self._last_update_key = None
 
   # Open / Close {{{
   def open(self) -> None:
@@ -89,6 +214,20 @@ class Dropdown(OptionList): # {{{
   def is_open(self) -> bool:
     section = self.parent
     return section is not None and section.has_class("-dropdown-open")
+
+  @property
+  def is_suppressed(self) -> bool:
+    """True if a programmatic fill is waiting for its update() to be skipped."""
+    return self._suppressed_text is not None
+
+  def _fill_suppressed(self, input_widget: Input, text: str) -> None:
+    """Set the input's text without re-running suggestions for it.
+    The Changed event arrives later, so the text to ignore is remembered
+    rather than a flag reset on exit; an update() for any other text clears it.
+    """
+    self._suppressed_text = text
+    input_widget.value = text
+    input_widget.cursor_position = len(text)
   # }}}
 
   # Navigation {{{
@@ -107,9 +246,16 @@ class Dropdown(OptionList): # {{{
   # Update options based on input text {{{
   def update(self, text: str) -> None:
     """Populate the dropdown based on current input text and stage."""
-    if self._suppress:
-      self._suppress = False
+    if self._suppressed_text is not None:
+      suppressed, self._suppressed_text = self._suppressed_text, None
+      if text == suppressed:
+        return
+
+    # The options depend only on these (and the schema); skip if already shown
+    key = (self.stage, self._picked_type, text)
+    if key == self._last_update_key and self.is_open:
       return
+    self._last_update_key = key
 
     if self.stage in (DropdownStage.TABLE, DropdownStage.COLUMN):
       self._update_column_stage(text)
@@ -122,23 +268,20 @@ class Dropdown(OptionList): # {{{
 
   def _update_column_stage(self, text: str) -> None:
     """Show table or column suggestions based on input text."""
-    if not self._table_columns:
+    if not self._schema.table_columns:
       self.close()
       return
 
-    if '.' in text and text.split('.', 1)[0]:
-      table, col_prefix = text.split('.', 1)
-      columns = self._table_columns.get(table, [])
-      matches = [c for c in columns if c.lower().startswith(col_prefix.lower())]
+    table, dot, col_prefix = text.partition('.')
+    if dot and table:
+      column_index = self._schema.column_index_by_table.get(table)
+      matches = column_index.match(col_prefix.casefold(), self.MAX_SUGGESTIONS) if column_index else []
       self.stage = DropdownStage.COLUMN
     elif text.startswith('.'):
-      col_prefix = text[1:]
-      all_columns = list(self._column_lookup.keys())
-      matches = [c for c in all_columns if c.lower().startswith(col_prefix.lower())]
+      matches = self._schema.column_index.match(text[1:].casefold(), self.MAX_SUGGESTIONS)
       self.stage = DropdownStage.COLUMN
     else:
-      tables = list(self._table_columns.keys())
-      matches = [t for t in tables if t.lower().startswith(text.lower())]
+      matches = self._schema.table_index.match(text.casefold(), self.MAX_SUGGESTIONS)
       self.stage = DropdownStage.TABLE
 
     self._show_matches(matches)
@@ -149,8 +292,9 @@ class Dropdown(OptionList): # {{{
     if self._picked_type and category is None:
       # Might be a USER-DEFINED enum type
       category = "enum"
-    operators = OPERATORS_BY_TYPE.get(category, list(OPERATORS_BY_TYPE["text"]))
-    matches = [op for op in operators if op.lower().startswith(text.lower())]
+    prefix = text.casefold()
+    buckets = _OPERATOR_INDEX.get(category, _OPERATOR_INDEX["text"])
+    matches = _filter_prefix(buckets.get(prefix[:1], ()), prefix)
     self._show_matches(matches)
 
   def _update_value_stage(self, text: str) -> None:
@@ -158,13 +302,12 @@ class Dropdown(OptionList): # {{{
     category = TYPE_CATEGORIES.get(self._picked_type, None)
 
     if category == "bool":
-      options = ["true", "false"]
-      matches = [v for v in options if v.startswith(text.lower())]
+      matches = _filter_prefix(_BOOL_FOLDED, text.casefold())
       self._show_matches(matches)
-    elif category is None and self._picked_type in self._enum_values:
+    elif category is None and self._picked_type in self._schema.enum_values_folded:
       # Enum type
-      values = self._enum_values[self._picked_type]
-      matches = [v for v in values if v.lower().startswith(text.lower())]
+      pairs = self._schema.enum_values_folded[self._picked_type]
+      matches = _filter_prefix(pairs, text.casefold())
       self._show_matches(matches)
     else:
       # Free text — no dropdown suggestions
@@ -172,19 +315,18 @@ class Dropdown(OptionList): # {{{
 
   def _update_direction_stage(self, text: str) -> None:
     """Show ASC/DESC suggestions for ORDER BY direction."""
-    options = ["ASC", "DESC"]
-    matches = [o for o in options if o.lower().startswith(text.lower())]
+    matches = _filter_prefix(_DIRECTION_FOLDED, text.casefold())
     self._show_matches(matches)
 
-  def _show_matches(self, matches: list[str]) -> None:
-    """Populate with matches and open, or close if empty."""
-    self.clear_options()
+  def _show_matches(self, matches: Iterable[str]) -> None:
+    """Populate with up to MAX_SUGGESTIONS matches and open, or close if empty."""
+    matches = list(islice(matches, self.MAX_SUGGESTIONS))
     if matches:
-      for m in matches:
-        self.add_option(m)
+      self.set_options(matches)  # One bulk replace rather than an add per match
       self.highlighted = 0
       self.open()
     else:
+      self.clear_options()
       self.close()
   # }}}
 
@@ -214,19 +356,18 @@ class Dropdown(OptionList): # {{{
 
     elif self.stage == DropdownStage.COLUMN:
       # Assemble full column name
-      table = input_widget.value.split('.', 1)[0]
+      table = input_widget.value.partition('.')[0]
       full_column = f"{table}.{value}" if table else value
       if self.mode == "select":
         # Fill input, close dropdown — user confirms with Enter
-        self._suppress = True
-        input_widget.value = full_column
-        input_widget.cursor_position = len(input_widget.value)
+        self._fill_suppressed(input_widget, full_column)
         self.close()
         return None
       elif self.mode == "order":
         # Order mode: store column, advance to DIRECTION
         self._picked_column = full_column
         self.stage = DropdownStage.DIRECTION
+        self._progress_text = f"{full_column} [ASC/DESC?]"
         input_widget.value = ""
         self._update_direction_stage("")
         return None
@@ -234,8 +375,9 @@ class Dropdown(OptionList): # {{{
         # Filter mode: store column, advance to OPERATOR
         self._picked_column = full_column
         # Look up type
-        self._picked_type = self._column_types.get(full_column, "")
+        self._picked_type = self._schema.column_types.get(full_column, "")
         self.stage = DropdownStage.OPERATOR
+        self._progress_text = f"{full_column} ..."
         input_widget.value = ""
         self.update("")
         return None
@@ -257,6 +399,7 @@ class Dropdown(OptionList): # {{{
       else:
         # Advance to VALUE stage
         self.stage = DropdownStage.VALUE
+        self._progress_text = f"{self._picked_column} {value} ..."
         input_widget.value = ""
         self.update("")
         return None
@@ -335,15 +478,12 @@ class Dropdown(OptionList): # {{{
     self._picked_column = ""
     self._picked_type = ""
     self._picked_operator = ""
+    self._progress_text = ""
 
   def get_progress_text(self) -> str:
-    """Return text showing the filter/order being built."""
-    if self.stage == DropdownStage.OPERATOR:
-      return f"{self._picked_column} ..."
-    elif self.stage == DropdownStage.VALUE:
-      return f"{self._picked_column} {self._picked_operator} ..."
-    elif self.stage == DropdownStage.DIRECTION:
-      return f"{self._picked_column} [ASC/DESC?]"
-    return ""
+    """Return text showing the filter/order being built.
+    Precomputed at each stage transition, so this is cheap to call per keystroke.
+    """
+    return self._progress_text
   # }}}
 # }}}
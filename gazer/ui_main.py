@@ -1,3 +1,4 @@
+import argparse
 import atexit
 from typing import cast
 
@@ -29,9 +30,10 @@ class GazerApp(App):
     Binding("ctrl+c", "app.quit", "Quit", show=False, priority=True),
   ]
 
-  def __init__(self) -> None:
+  def __init__(self, refresh_schema: bool = False) -> None:
     super().__init__()
     self.config = Config()
+    self.refresh_schema = refresh_schema  # Ignore the on-disk schema cache
     self.db: DBConnector | None = None
     self.schema_inspector: SchemaInspector | None = None
     self.query_builder: QueryBuilder | None = None
@@ -232,7 +234,15 @@ class ConnectionScreen(Screen):
 
 
 def main() -> None:
-  app = GazerApp()
+  parser = argparse.ArgumentParser(prog="gazer", description="Database query builder")
+  parser.add_argument(
+    "--refresh-schema",
+    action="store_true",
+    help="ignore the cached schema and re-introspect the database",
+  )
+  args = parser.parse_args()
+
+  app = GazerApp(refresh_schema=args.refresh_schema)
   atexit.register(app.cleanup)
   app.run()
 
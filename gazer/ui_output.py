@@ -1,22 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import Iterable
+from operator import itemgetter
 from typing import TYPE_CHECKING, cast
 
+from rich.text import Text
+from textual import work
+from textual.worker import get_current_worker
 from textual.app import ComposeResult
 from textual.binding import Binding
-from textual.containers import Vertical, ScrollableContainer
+from textual.containers import Vertical
 from textual.screen import ModalScreen
-from textual.widgets import Static, Input, DataTable, Label, OptionList
+from textual.widgets import Static, Input, DataTable, Label, OptionList, Tree
 from textual.widgets.option_list import Option
 
+from .core_connect import RowIterator
 from .core_export import export_csv
 from .mem_presets import load_presets, save_preset
+from .ui_error import ErrorOverlay
 
 if TYPE_CHECKING:
   from .ui_main import GazerApp
 
 
+# Cell text for singleton values, shared by every results table
+_FIXED_CELLS = {None: "None", True: "True", False: "False"}
+
+
 class ResultsScreen(ModalScreen): # {{{
   """Modal screen showing query results in a DataTable."""
 
@@ -26,17 +38,23 @@ class ResultsScreen(ModalScreen): # {{{
   ]
 
   MAX_DISPLAY_ROWS = 100
+  FIRST_PAINT_ROWS = 40   # Rendered synchronously on mount
+  RENDER_CHUNK_ROWS = 50  # Rendered per event-loop tick afterwards
 
-  def __init__(self, sql: str, params: list, rows: list[dict]) -> None:
+  def __init__(self, sql: str, params: list, rows: list[dict],
+               total: int | None = None) -> None:
+    """rows may be just the first MAX_DISPLAY_ROWS; total is the full row count."""
     super().__init__()
     self._sql = sql
     self._params = params
     self._rows = rows
+    self._total = len(rows) if total is None else total
 
   def compose(self) -> ComposeResult:
-    total = len(self._rows)
-    if total > self.MAX_DISPLAY_ROWS:
-      count_text = f"Showing {self.MAX_DISPLAY_ROWS} of {total} rows"
+    total = self._total
+    shown = min(len(self._rows), self.MAX_DISPLAY_ROWS)
+    if total > shown:
+      count_text = f"Showing {shown} of {total} rows"
     else:
       count_text = f"{total} rows"
 
@@ -49,34 +67,106 @@ class ResultsScreen(ModalScreen): # {{{
     table = self.query_one("#results-table", DataTable)
     if not self._rows:
       return
-    for key in self._rows[0].keys():
-      table.add_column(str(key), key=str(key))
-    for row in self._rows[:self.MAX_DISPLAY_ROWS]:
-      table.add_row(*[str(v) for v in row.values()])
+    keys = list(self._rows[0].keys())
+    table.add_columns(*[(str(k), str(k)) for k in keys])
+    self._cell_caches: list[dict[int, str]] = [{} for _ in keys]
+    # itemgetter returns a bare value (not a tuple) for a single key
+    if len(keys) == 1:
+      only = keys[0]
+      self._row_values = lambda row: (row[only],)
+    else:
+      self._row_values = itemgetter(*keys)
+
+    first = self._rows[:self.FIRST_PAINT_ROWS]
+    table.add_rows(self._format_rows(first))
+    pending = self._rows[self.FIRST_PAINT_ROWS:self.MAX_DISPLAY_ROWS]
+    if pending:
+      self._render_pending_rows(table, pending)
+
+  @work(exclusive=True)
+  async def _render_pending_rows(self, table: DataTable, pending: list[dict]) -> None:
+    """Append the remaining rows in chunks, yielding to the event loop between them."""
+    step = self.RENDER_CHUNK_ROWS
+    for start in range(0, len(pending), step):
+      chunk = pending[start:start + step]
+      table.add_rows(self._format_rows(chunk))
+      await asyncio.sleep(0)
+
+  def _format_rows(self, rows: list[dict]) -> list[list[str]]:
+    """Stringify cells, sharing one string per repeated value in a column.
+    Only None, bools and plain ints are cached: for them equal values always
+    print the same (unlike e.g. Decimal('1.0') == Decimal('1')), and str()
+    of a str already returns the same object.
+    """
+    caches = self._cell_caches
+    row_values = self._row_values
+    formatted: list[list[str]] = []
+    for row in rows:
+      cells: list[str] = []
+      for value, cache in zip(row_values(row), caches):
+        if value is None or value is True or value is False:
+          text = _FIXED_CELLS[value]
+        elif type(value) is int:
+          text = cache.get(value)
+          if text is None:
+            text = cache[value] = str(value)
+        else:
+          text = str(value)
+        cells.append(text)
+      formatted.append(cells)
+    return formatted
 
   def action_dismiss(self) -> None:
     self.dismiss()
 
+  @work(thread=True)
   def action_export(self) -> None:
-    self.app.push_screen(ExportDialog(self._rows))
+    """Open the export dialog, re-running the query if only a preview was fetched.
+    The re-run streams from a server-side cursor, so the full result is never
+    held in memory; the preview's total stands in for its row count.
+    """
+    if len(self._rows) >= self._total:
+      self.app.call_from_thread(
+        self.app.push_screen, ExportDialog(self._rows, len(self._rows))
+      )
+      return
+    app = cast("GazerApp", self.app)
+    try:
+      rows_iter = app.db.execute_query_stream(self._sql, self._params)
+      self.app.call_from_thread(self.app.push_screen, ExportDialog(rows_iter, self._total))
+    except Exception as e:
+      error_msg = f"{type(e).__name__}: {e}"
+      self.app.call_from_thread(
+        self.app.push_screen, ErrorOverlay("Export", "Failed to fetch rows for export.", error_msg)
+      )
 # }}}
 
 
 class ExportDialog(ModalScreen): # {{{
-  """Modal dialog that asks for a file path, then exports query results to CSV."""
+  """Modal dialog that asks for a file path, then exports query results to CSV.
+  A RowIterator source is streamed from its cursor, so it can only be exported
+  once; a list of rows can be exported again, e.g. after a failed attempt.
+  """
 
   BINDINGS = [
     Binding("escape", "dismiss", "Cancel", show=False),
   ]
 
-  def __init__(self, rows: list[dict]) -> None:
+  def __init__(self, row_source: Iterable[dict], row_count: int | None) -> None:
+    """row_count is None when the rows are streamed and their count is unknown."""
     super().__init__()
-    self._rows = rows
+    self._row_source: Iterable[dict] | None = row_source
+    self._row_count = row_count
+    self._exporting = False
 
   def compose(self) -> ComposeResult:
     with Vertical(id="export-box"):
       yield Static("Export to CSV", id="export-title")
-      yield Static(f"{len(self._rows)} rows to export", classes="export-info")
+      if self._row_count is None:
+        info = "Rows are streamed from the database while exporting"
+      else:
+        info = f"{self._row_count} rows to export"
+      yield Static(info, classes="export-info")
       yield Input(
         placeholder="Enter file path (e.g. ~/export.csv)",
         id="export-path"
@@ -95,8 +185,9 @@ class ExportDialog(ModalScreen): # {{{
 
   def on_input_submitted(self, event: Input.Submitted) -> None:
     """Export when the user presses Enter on the file path input."""
-    filepath = os.path.expanduser(event.value.strip())
-    if not filepath:
+    raw = event.value.strip()
+    filepath = os.path.expanduser(raw)
+    if not filepath or self._exporting:
       return
 
     if not filepath.endswith(".csv"):
@@ -108,13 +199,76 @@ class ExportDialog(ModalScreen): # {{{
       self.query_one(".hint", Static).update(f"Directory does not exist: {parent or filepath}")
       return
 
+    # Catch unwritable targets before a one-shot row source is spent on them
+    if os.path.isdir(filepath):
+      self.query_one(".hint", Static).update(f"Path is a directory: {filepath}")
+      return
+    if not os.access(parent, os.W_OK) or (
+        os.path.exists(filepath) and not os.access(filepath, os.W_OK)):
+      self.query_one(".hint", Static).update(f"Cannot write to: {filepath}")
+      return
+
+    if self._row_source is None:
+      self.query_one(".hint", Static).update("Rows were already streamed — run the query again")
+      return
+
+    row_source = self._row_source
+    if isinstance(row_source, RowIterator):
+      self._row_source = None
+    self._exporting = True
+    if self._row_count is None:
+      self.query_one(".hint", Static).update("Exporting rows...")
+    else:
+      self.query_one(".hint", Static).update(f"Exporting {self._row_count} rows...")
+    self._do_export(row_source, filepath, os.path.dirname(raw))
+
+  @work(exclusive=True, thread=True)
+  def _do_export(self, row_source: Iterable[dict], filepath: str, export_dir: str) -> None:
+    """Write the CSV in a worker thread so the UI stays responsive.
+    Dismissing the dialog cancels the worker, which stops the export and
+    removes the partial file.
+    """
+    worker = get_current_worker()
     try:
-      count = export_csv(self._rows, filepath)
-      app = cast("GazerApp", self.app)
-      app.config.set_export_path(os.path.dirname(event.value.strip()))
-      self.query_one(".hint", Static).update(f"Exported {count} rows to {filepath}")
+      count = export_csv(row_source, filepath, lambda: worker.is_cancelled)
     except Exception as e:
-      self.query_one(".hint", Static).update(f"Export failed: {e}")
+      message = f"Export failed: {e}"
+      if isinstance(row_source, RowIterator):
+        message += " — run the query again to retry"
+      self.app.call_from_thread(self._on_export_done, message, None)
+      return
+    finally:
+      self._close_rows(row_source)
+    if count is None:
+      return  # Cancelled; nothing is left to report
+    if not count:
+      # export_csv writes no file for an empty result
+      self.app.call_from_thread(self._on_export_done, "Query returned no rows.", None)
+      return
+    self.app.call_from_thread(
+      self._on_export_done, f"Exported {count} rows to {filepath}", export_dir
+    )
+
+  def _on_export_done(self, message: str, export_dir: str | None) -> None:
+    """Report the export result; remember the directory if it succeeded."""
+    self._exporting = False
+    if export_dir is not None:
+      app = cast("GazerApp", self.app)
+      app.config.set_export_path(export_dir)
+    if self.is_attached:
+      self.query_one(".hint", Static).update(message)
+
+  def on_unmount(self) -> None:
+    """Release the cursor behind rows that were never exported."""
+    row_source, self._row_source = self._row_source, None
+    if row_source is not None:
+      self._close_rows(row_source)
+
+  @staticmethod
+  def _close_rows(row_source: Iterable[dict]) -> None:
+    """Close a lazy row source's cursor; plain lists need nothing."""
+    if isinstance(row_source, RowIterator):
+      row_source.close()
 
   def action_dismiss(self) -> None:
     self.dismiss()
@@ -140,9 +294,10 @@ class PresetPicker(ModalScreen): # {{{
 
   def on_mount(self) -> None:
     option_list = self.query_one("#preset-list", OptionList)
-    for name in self._presets:
-      cols = ", ".join(self._presets[name])
-      option_list.add_option(Option(f"{name}  ({cols})", id=name))
+    option_list.add_options(
+      Option(f"{name}  ({', '.join(cols)})", id=name)
+      for name, cols in self._presets.items()
+    )
     if not self._presets:
       self.query_one(".hint", Static).update("No presets saved yet")
 
@@ -195,39 +350,62 @@ class PresetSaver(ModalScreen): # {{{
 # }}}
 
 
+def render_schema(schema_data: list[dict]) -> list[tuple[str, tuple[str, ...]]]:
+  """Format schema data as (table_name, column_labels) pairs for SchemaScreen.
+  Pure string work, so it can run in a worker thread.
+  """
+  rendered: list[tuple[str, tuple[str, ...]]] = []
+  for item in schema_data:
+    labels: list[str] = []
+    for col in item['columns']:
+      parts = [col['name'], col['udt_name']]
+      if col['is_primary_key']:
+        parts.append("PK")
+      if col['is_foreign_key']:
+        parts.append(f"FK→{col['fk_table']}.{col['fk_column']}")
+      labels.append("; ".join(parts))
+    rendered.append((item['table'], tuple(labels)))
+  return rendered
+
+
 class SchemaScreen(ModalScreen): # {{{
-  """Modal screen showing the database schema tree."""
+  """Modal screen showing the database schema tree.
+  Tables start collapsed; a table's column nodes exist only while it is expanded.
+  """
 
   BINDINGS = [
     Binding("escape", "dismiss", "Dismiss", show=False),
   ]
 
-  def __init__(self, schema_data: list[dict]) -> None:
+  def __init__(self, schema_lines: list[tuple[str, tuple[str, ...]]]) -> None:
+    """schema_lines: (table_name, column_labels) pairs from render_schema()."""
     super().__init__()
-    self._schema_data = schema_data
+    self._schema_lines = schema_lines
 
   def compose(self) -> ComposeResult:
     with Vertical(id="schema-box"):
       yield Label("SCHEMA", id="schema-title")
-      with ScrollableContainer(id="schema-content"):
-        pass
-      yield Static("'escape' dismiss", classes="hint")
+      yield Tree("SCHEMA", id="schema-content")
+      yield Static("'enter' expand/collapse | 'escape' dismiss", classes="hint")
 
   def on_mount(self) -> None:
-    container = self.query_one("#schema-content", ScrollableContainer)
-    for item in self._schema_data:
-      table_name = item['table']
-      columns = item['columns']
-      container.mount(Static(table_name, classes="table-name"))
-      for i, col in enumerate(columns):
-        connector = "└─" if i == len(columns) - 1 else "├─"
-        col_str = f"  {connector} {col['name']}; {col['udt_name']}"
-        if col['is_primary_key']:
-          col_str += "; PK"
-        if col['is_foreign_key']:
-          col_str += f"; FK→{col['fk_table']}.{col['fk_column']}"
-        container.mount(Static(col_str))
-      container.mount(Static(""))
+    tree = self.query_one("#schema-content", Tree)
+    tree.show_root = False
+    for table_name, column_labels in self._schema_lines:
+      tree.root.add(Text(table_name, style="bold"), data=column_labels)
+    tree.focus()
+
+  def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+    """Add the table's column nodes when it is expanded."""
+    node = event.node
+    if node.data is not None and not node.children:
+      for label in node.data:
+        node.add_leaf(Text(label))
+
+  def on_tree_node_collapsed(self, event: Tree.NodeCollapsed) -> None:
+    """Drop the column nodes again when the table is collapsed."""
+    if event.node.data is not None:
+      event.node.remove_children()
 
   def action_dismiss(self) -> None:
     self.dismiss()
@@ -1,4 +1,7 @@
 from __future__ import annotations
+from collections import defaultdict
+from collections.abc import Mapping
+from itertools import islice
 from typing import TYPE_CHECKING, cast
 
 from textual import events
@@ -7,15 +10,23 @@ from textual.binding import Binding
 from textual import work
 from textual.containers import Container, Vertical, ScrollableContainer
 from textual.screen import Screen
+from textual.timer import Timer
 from textual.widgets import Static, Input, Label, Header, Footer
 
+from .mem_schema import load_schema_data, save_schema_data
 from .ui_error import ErrorOverlay
-from .ui_dropdown import Dropdown
-from .ui_output import ResultsScreen, ExportDialog, PresetPicker, PresetSaver, SchemaScreen
+from .ui_dropdown import Dropdown, SchemaIndex
+from .ui_output import (
+  ResultsScreen, ExportDialog, PresetPicker, PresetSaver, SchemaScreen, render_schema,
+)
 
 if TYPE_CHECKING:
   from .ui_main import GazerApp
-  from .core_sql_build import QueryBuilder
+  from .core_sql_build import FilterGroup, QueryBuilder
+
+
+# Filter tree indentation by depth; _INDENT[i] == "  " * i
+_INDENT = tuple("  " * i for i in range(64))
 
 
 class SQLBuilderScreen(Screen): # {{{
@@ -35,10 +46,21 @@ class SQLBuilderScreen(Screen): # {{{
     """Initialize with a SchemaInspector instance."""
     super().__init__()
     self.inspector = schema_inspector
-    self._schema_data: list[dict] = []
-    self._column_lookup: dict[str, list[str]] = {}
-    self._table_columns: dict[str, list[str]] = {}
-    self._column_types: dict[str, str] = {}
+    self._schema_lines: list[tuple[str, tuple[str, ...]]] = []  # Pre-rendered for SchemaScreen
+    self._column_lookup: Mapping[str, tuple[str, ...]] = {}
+    self._table_column_set: dict[str, frozenset[str]] = {}  # For O(1) validation
+    self._schema_loaded = False  # Dropdowns stay idle until the first schema arrives
+    # QueryBuilder section versions as of the last refresh_display
+    self._last_versions: tuple[int, int, int] = (0, 0, 0)
+    # Debounced dropdown refreshes, per input: the armed timer and its text
+    self._dropdown_timers: dict[Input, Timer] = {}
+    self._pending_text: dict[Input, str] = {}
+    # Last rendered body text per panel, used to skip unchanged refreshes
+    self._last_panels: dict[str, str] = {
+      "select": "Awaiting SELECT Input",
+      "order": "Awaiting ORDER Input",
+      "filter": "Awaiting FILTER Input",
+    }
 
   # Compose {{{
   def compose(self) -> ComposeResult:
@@ -57,7 +79,8 @@ class SQLBuilderScreen(Screen): # {{{
         )
         yield Dropdown(mode="select", id="select-dropdown")
         with ScrollableContainer(id="select-content", classes="content-area"):
-          yield Static("Awaiting SELECT Input")
+          yield Static("[DISTINCT]", id="distinct-badge", classes="distinct-badge", markup=False)
+          yield Static("Awaiting SELECT Input", id="select-body", markup=False)
 
       # Right: ORDER BY + FILTER
       with Vertical(id="right-panel"):
@@ -72,7 +95,7 @@ class SQLBuilderScreen(Screen): # {{{
           )
           yield Dropdown(mode="order", id="order-dropdown")
           with ScrollableContainer(id="order-content", classes="content-area"):
-            yield Static("Awaiting ORDER Input")
+            yield Static("Awaiting ORDER Input", id="order-body", markup=False)
 
         # Lower right: FILTER section
         with Container(id="filter-section"):
@@ -85,17 +108,42 @@ class SQLBuilderScreen(Screen): # {{{
           )
           yield Dropdown(mode="filter", id="filter-dropdown")
           with ScrollableContainer(id="filter-content", classes="content-area"):
-            yield Static("Awaiting FILTER Input")
+            yield Static("Awaiting FILTER Input", id="filter-body", markup=False)
 
     yield Footer()
 
   def on_mount(self) -> None:
     """Called when screen is mounted."""
-    self.query_one("#select-input", Input).focus()
+    # Cache widgets used by per-keystroke handlers to avoid repeated DOM queries
+    self._inputs: dict[str, Input] = {
+      input_id: self.query_one(f"#{input_id}", Input) for input_id in self._PAIRS
+    }
+    self._dropdowns: dict[str, Dropdown] = {
+      dropdown_id: self.query_one(f"#{dropdown_id}", Dropdown)
+      for dropdown_id in self._PAIRS.values()
+    }
+    # Paired dropdown by input widget, so events route without id lookups
+    self._dropdown_for: dict[Input, Dropdown] = {
+      self._inputs[input_id]: self._dropdowns[dropdown_id]
+      for input_id, dropdown_id in self._PAIRS.items()
+    }
+    self._filter_progress: Static = self.query_one("#filter-progress", Static)
+    self._last_progress: str = ""
+    self._bodies: dict[str, Static] = {
+      name: self.query_one(f"#{name}-body", Static)
+      for name in ("select", "order", "filter")
+    }
+    self._distinct_badge: Static = self.query_one("#distinct-badge", Static)
+    self._distinct_badge.display = False
+
+    self._inputs["select-input"].focus()
     self.load_schema()
   # }}}
 
   # Input-Dropdown Pairing {{{
+  DROPDOWN_DEBOUNCE = 0.05  # Seconds of typing quiet before suggestions refresh
+  _DROPDOWN_KEYS = frozenset({"down", "tab", "up", "escape"})
+
   _PAIRS = {
     "select-input": "select-dropdown",
     "filter-input": "filter-dropdown",
@@ -104,39 +152,59 @@ class SQLBuilderScreen(Screen): # {{{
 
   def _active_dropdown(self) -> Dropdown | None:
     """Return the dropdown paired with the currently focused input."""
-    for input_id, dropdown_id in self._PAIRS.items():
-      if self.query_one(f"#{input_id}", Input).has_focus:
-        return self.query_one(f"#{dropdown_id}", Dropdown)
-    return None
+    focused = self.focused
+    return self._dropdown_for.get(focused) if isinstance(focused, Input) else None
 
   def _active_input(self) -> Input | None:
     """Return the currently focused input if it has a paired dropdown."""
-    for input_id in self._PAIRS:
-      inp = self.query_one(f"#{input_id}", Input)
-      if inp.has_focus:
-        return inp
-    return None
+    focused = self.focused
+    return focused if isinstance(focused, Input) and focused in self._dropdown_for else None
   # }}}
 
   # Event Routing {{{
   def on_input_changed(self, event: Input.Changed) -> None:
-    """Route input changes to the paired dropdown."""
-    dropdown_id = self._PAIRS.get(event.input.id)
-    if dropdown_id is None:
+    """Route input changes to the paired dropdown, debouncing rapid keystrokes."""
+    inp = event.input
+    dropdown = self._dropdown_for.get(inp)
+    if dropdown is None or not self._schema_loaded:
+      return  # Not a paired input, or the schema has not loaded yet
+    if dropdown.is_suppressed:
+      # Programmatic value change; let the dropdown swallow it right away
+      self._refresh_dropdown(inp, event.value)
       return
-    dropdown = self.query_one(f"#{dropdown_id}", Dropdown)
-    dropdown.update(event.value)
-    # Update filter progress label
-    if event.input.id == "filter-input":
-      self.query_one("#filter-progress", Static).update(dropdown.get_progress_text())
+
+    timer = self._dropdown_timers.get(inp)
+    if timer is not None:
+      timer.stop()
+    self._pending_text[inp] = event.value
+    self._dropdown_timers[inp] = self.set_timer(
+      self.DROPDOWN_DEBOUNCE, lambda: self._flush_dropdown(inp)
+    )
+
+  def _flush_dropdown(self, inp: Input | None = None) -> None:
+    """Apply pending debounced refreshes now: one input's, or all if None."""
+    for pending in ([inp] if inp is not None else list(self._pending_text)):
+      timer = self._dropdown_timers.pop(pending, None)
+      if timer is not None:
+        timer.stop()
+      text = self._pending_text.pop(pending, None)
+      if text is not None:
+        self._refresh_dropdown(pending, text)
+
+  def _refresh_dropdown(self, inp: Input, text: str) -> None:
+    """Update an input's dropdown, and the filter progress label."""
+    dropdown = self._dropdown_for[inp]
+    dropdown.update(text)
+    if inp.id == "filter-input":
+      self._set_progress(dropdown.get_progress_text())
 
   def on_input_submitted(self, event: Input.Submitted) -> None:
     """On Enter: pick from dropdown, or submit the input text."""
-    dropdown_id = self._PAIRS.get(event.input.id)
-    if dropdown_id is None:
+    dropdown = self._dropdown_for.get(event.input)
+    if dropdown is None:
       return
 
-    dropdown = self.query_one(f"#{dropdown_id}", Dropdown)
+    self._flush_dropdown(event.input)  # Pick from suggestions for the text as typed
 
     if dropdown.is_open and dropdown.highlighted is not None:
       # Pick from dropdown
@@ -161,10 +229,20 @@ class SQLBuilderScreen(Screen): # {{{
 
     # Update filter progress label
     if event.input.id == "filter-input":
-      self.query_one("#filter-progress", Static).update(dropdown.get_progress_text())
+      self._set_progress(dropdown.get_progress_text())
+
+  def _set_progress(self, text: str) -> None:
+    """Update the filter progress label, skipping the repaint if unchanged."""
+    if text == self._last_progress:
+      return
+    self._last_progress = text
+    self._filter_progress.update(text)
 
   def on_key(self, event: events.Key) -> None:
     """Intercept Up/Down/Escape/Tab to control the active dropdown."""
+    if event.key not in self._DROPDOWN_KEYS:
+      return
+    self._flush_dropdown()  # Navigate the suggestions for the text as typed
     dropdown = self._active_dropdown()
     if dropdown is None or not dropdown.is_open:
       return
@@ -204,15 +282,15 @@ class SQLBuilderScreen(Screen): # {{{
     value = result["value"]
 
     # Split "table.column" for add_filter
-    if '.' in column:
-      table, col = column.split('.', 1)
+    table, dot, col = column.partition('.')
+    if dot:
       query_builder.add_filter(col, operator, value, table_name=table)
     else:
       query_builder.add_filter(column, operator, value)
 
     self.refresh_display()
     # Clear progress label
-    self.query_one("#filter-progress", Static).update("")
+    self._set_progress("")
 
   def _submit_order(self, result: dict) -> None:
     """Add a completed ORDER BY entry to the query builder."""
@@ -225,15 +303,15 @@ class SQLBuilderScreen(Screen): # {{{
     """Parse input into (table, column). Returns None on error.
     Accepts 'table.column' or bare 'column' (looked up from schema).
     """
-    if '.' in text:
-      table, column = text.split('.', 1)
+    table, dot, column = text.partition('.')
+    if dot:
       if not table:
         text = column
       else:
-        if table not in self._table_columns:
+        if table not in self._table_column_set:
           self.show_error("Select", f"Table '{table}' not found in schema.")
           return None
-        if column not in self._table_columns[table]:
+        if column not in self._table_column_set[table]:
           self.show_error("Select", f"Column '{column}' not found in table '{table}'.")
           return None
         return table, column
@@ -273,57 +351,120 @@ class SQLBuilderScreen(Screen): # {{{
   # Loading and Displaying Schema {{{
   @work(exclusive=True, thread=True)
   def load_schema(self) -> None:
-    """Load schema data from the database in a background thread."""
+    """Load schema data in a background thread.
+    Shows the on-disk copy first if there is one, then re-introspects the
+    database only if its catalog fingerprint no longer matches.
+    """
+    app = cast("GazerApp", self.app)
+    db = app.db
+    schema = self.inspector.schema
+    cached = cached_display = None
     try:
+      if db is not None and not app.refresh_schema:
+        cached = load_schema_data(db.host, db.port, db.database, db.user, schema)
+      if cached is not None:
+        cached_display = (
+          render_schema(cached['schema_data']),
+          *self._index_schema(cached['schema_data'], cached['enum_values']),
+        )
+    except Exception:
+      cached = cached_display = None  # A broken cache is just a miss; introspect instead
+    if cached_display is not None:
+      self.app.call_from_thread(self.display_schema, *cached_display)
+
+    try:
+      fingerprint = self.inspector.fetch_fingerprint()
+      if cached is not None and cached['fingerprint'] == fingerprint:
+        return
+
       tables = self.inspector.get_tables()
-      schema_data = []
-      for table in tables:
-        columns = self.inspector.get_columns(table)
-        schema_data.append({
-          'table': table,
-          'columns': columns
-        })
-
-      # Prefetch enum values (DB calls, must be in worker thread)
-      enum_values: dict[str, list[str]] = {}
-      for item in schema_data:
-        for col in item['columns']:
-          udt = col['udt_name']
-          if col['type'] == 'USER-DEFINED' and udt not in enum_values:
-            enum_values[udt] = self.inspector.get_enum_values(udt)
-
-      self.app.call_from_thread(self.display_schema, schema_data, enum_values)
+      all_columns = self.inspector.get_all_columns()
+      schema_data = [
+        {'table': table, 'columns': all_columns.get(table, [])}
+        for table in tables
+      ]
+
+      # Prefetch enum values in one round-trip (DB call, must be in worker thread)
+      enum_values = self.inspector.get_enum_values_many(
+        col['udt_name']
+        for item in schema_data
+        for col in item['columns']
+        if col['type'] == 'USER-DEFINED'
+      )
+
+      self.app.call_from_thread(
+        self.display_schema, render_schema(schema_data),
+        *self._index_schema(schema_data, enum_values),
+      )
 
     except Exception as e:
       error_msg = f"{type(e).__name__}: {e}"
-      self.app.call_from_thread(self.show_error, "Schema", error_msg)
-
-  def display_schema(self, schema_data: list, enum_values: dict) -> None:
-    """Store schema and set up dropdowns."""
-    self._schema_data = schema_data
+      if cached_display is not None:
+        # The saved schema is already usable; warn without blocking it
+        self.app.call_from_thread(
+          self.app.notify, f"Could not check the saved schema: {error_msg}",
+          title="Schema", severity="warning",
+        )
+      else:
+        self.app.call_from_thread(self.show_error, "Schema", error_msg)
+      return
 
-    # Build lookup structures
-    self._column_lookup = {}
-    self._table_columns = {}
-    self._column_types = {}
+    if db is not None:
+      try:
+        save_schema_data(
+          db.host, db.port, db.database, db.user, schema,
+          fingerprint, schema_data, enum_values,
+        )
+      except OSError:
+        pass  # The cache is only a startup shortcut
+
+  @staticmethod
+  def _index_schema(schema_data: list[dict], enum_values: dict[str, list[str]]
+                    ) -> tuple[SchemaIndex, dict[str, frozenset[str]]]:
+    """Build the lookup structures for a schema (runs in the worker thread)."""
+    column_lookup: defaultdict[str, list[str]] = defaultdict(list)
+    table_columns: dict[str, list[str]] = {}
+    column_types: dict[str, str] = {}
+    # One pass over the columns, with the hot lookups bound to locals
     for item in schema_data:
       table = item['table']
-      col_names = []
+      col_names: list[str] = []
+      add_name = col_names.append
       for col in item['columns']:
-        col_names.append(col['name'])
-        self._column_lookup.setdefault(col['name'], []).append(table)
-        self._column_types[f"{table}.{col['name']}"] = col['udt_name']
-      self._table_columns[table] = col_names
-
-    # Pass schema data to all dropdowns
-    for dropdown_id in ("select-dropdown", "filter-dropdown", "order-dropdown"):
-      self.query_one(f"#{dropdown_id}", Dropdown).set_schema(
-        self._table_columns, self._column_lookup,
-        self._column_types, enum_values,
-      )
-
-    # Open the select dropdown (input is already focused)
-    self.query_one("#select-dropdown", Dropdown).update("")
+        name = col['name']
+        add_name(name)
+        column_lookup[name].append(table)
+        column_types[f"{table}.{name}"] = col['udt_name']
+      table_columns[table] = col_names
+
+    index = SchemaIndex(table_columns, column_lookup, column_types, enum_values)
+    table_column_set = {t: frozenset(cs) for t, cs in index.table_columns.items()}
+    return index, table_column_set
+
+  def display_schema(self, schema_lines: list[tuple[str, tuple[str, ...]]],
+                     index: SchemaIndex, table_column_set: dict[str, frozenset[str]]) -> None:
+    """Store the prebuilt schema index and lines, and hand the index to the dropdowns.
+    Called again when a cached schema turns out to be stale; the user may have
+    typed by then, so open dropdowns are refreshed for their current text.
+    """
+    first_load = not self._schema_loaded
+    self._schema_loaded = True
+    self._schema_lines = schema_lines
+    self._column_lookup = index.column_lookup
+    self._table_column_set = table_column_set
+
+    # One index is shared between all dropdowns
+    for dropdown in self._dropdowns.values():
+      dropdown.set_schema(index)
+
+    if first_load:
+      # Open the select dropdown (input is already focused)
+      self._dropdowns["select-dropdown"].update("")
+      return
+    focused = self._active_input()
+    for inp, dropdown in self._dropdown_for.items():
+      if inp is focused or dropdown.is_open:
+        self._refresh_dropdown(inp, inp.value)
   # }}}
 
   # Displaying Query State {{{
@@ -333,68 +474,76 @@ class SQLBuilderScreen(Screen): # {{{
     query_builder = cast("QueryBuilder", app.query_builder)
 
     state = query_builder.get_state()
-    self._display_select(state)
-    self._display_filters(state)
-    self._display_order_by(state)
+    select_version, filter_version, order_version = state['versions']
+    last_select, last_filter, last_order = self._last_versions
+    if select_version != last_select:
+      self._display_select(state)
+    if filter_version != last_filter:
+      self._display_filters(state)
+    if order_version != last_order:
+      self._display_order_by(state)
+    self._last_versions = state['versions']
+
+  def _update_panel(self, name: str, text: str) -> None:
+    """Show text in a panel's body Static, skipping the update if unchanged."""
+    if text == self._last_panels[name]:
+      return
+    self._bodies[name].update(text)
+    self._last_panels[name] = text
 
   def _display_select(self, state: dict) -> None:
     """Render current columns in the SELECT panel, with DISTINCT badge if active."""
-    container = self.query_one("#select-content", ScrollableContainer)
-    container.remove_children()
-
-    if state.get('distinct'):
-      container.mount(Static("[DISTINCT]", classes="distinct-badge"))
-
+    self._distinct_badge.display = bool(state.get('distinct'))
     columns = state['columns']
     if not columns:
-      container.mount(Static("Awaiting SELECT Input"))
-      return
+      text = "Awaiting SELECT Input"
+    else:
+      text = "\n".join(f"  - {col}" for col in columns)
 
-    for col in columns:
-      container.mount(Static(f"  - {col}"))
+    self._update_panel("select", text)
 
   def _display_order_by(self, state: dict) -> None:
     """Render current ORDER BY entries in the ORDER BY panel."""
-    container = self.query_one("#order-content", ScrollableContainer)
-    container.remove_children()
-
     order_by = state['order_by']
     if not order_by:
-      container.mount(Static("Awaiting ORDER Input"))
-      return
+      text = "Awaiting ORDER Input"
+    else:
+      text = "\n".join(f"  - {entry['column']} {entry['direction']}" for entry in order_by)
 
-    for entry in order_by:
-      container.mount(Static(f"  - {entry['column']} {entry['direction']}"))
+    self._update_panel("order", text)
 
   def _display_filters(self, state: dict) -> None:
     """Render current filters in the FILTER panel."""
-    container = self.query_one("#filter-content", ScrollableContainer)
-    container.remove_children()
-
     root = state['root_group']
     if root.is_empty():
-      container.mount(Static("Awaiting FILTER Input"))
-      return
-
-    lines = self._format_filter_tree(root)
-    for line in lines:
-      container.mount(Static(line))
+      text = "Awaiting FILTER Input"
+    else:
+      text = "\n".join(self._format_filter_tree(root))
+    self._update_panel("filter", text)
 
-  def _format_filter_tree(self, group, indent: int = 0) -> list[str]:
-    """Recursively format a FilterGroup into display lines."""
-    from .core_sql_build import Filter, FilterGroup
+  def _format_filter_tree(self, group: FilterGroup) -> list[str]:
+    """Format a FilterGroup into display lines.
+    Walks the tree depth-first with an explicit stack instead of recursing.
+    """
     lines: list[str] = []
-    prefix = "  " * indent
-    children = group.children
-
-    for i, child in enumerate(children):
-      connector = "└─" if i == len(children) - 1 else "├─"
-
-      if isinstance(child, Filter):
-        lines.append(f"{prefix}{connector} {child}")
-      elif isinstance(child, FilterGroup):
-        lines.append(f"{prefix}{connector} {child.logic}")
-        lines.extend(self._format_filter_tree(child, indent + 1))
+    depth_limit = len(_INDENT)
+
+    # Entries are (node, indent, is_last_child), pushed in reverse so they pop in order
+    last = len(group.children) - 1
+    stack = [(child, 0, i == last) for i, child in reversed(list(enumerate(group.children)))]
+    while stack:
+      node, indent, is_last = stack.pop()
+      prefix = _INDENT[indent] if indent < depth_limit else "  " * indent
+      connector = "└─" if is_last else "├─"
+
+      if node.is_group:
+        lines.append(f"{prefix}{connector} {node.logic}")
+        last = len(node.children) - 1
+        stack.extend(
+          (child, indent + 1, i == last) for i, child in reversed(list(enumerate(node.children)))
+        )
+      else:
+        lines.append(f"{prefix}{connector} {node}")
 
     return lines
   # }}}
@@ -409,7 +558,7 @@ class SQLBuilderScreen(Screen): # {{{
 
   def action_show_schema(self) -> None:
     """Open the schema browser modal."""
-    self.app.push_screen(SchemaScreen(self._schema_data))
+    self.app.push_screen(SchemaScreen(self._schema_lines))
   # }}}
 
   # Presets {{{
@@ -427,10 +576,10 @@ class SQLBuilderScreen(Screen): # {{{
 
     valid: list[tuple[str, str]] = []
     for col_str in columns:
-      if '.' not in col_str:
+      table, dot, column = col_str.partition('.')
+      if not dot:
         continue
-      table, column = col_str.split('.', 1)
-      if table in self._table_columns and column in self._table_columns[table]:
+      if column in self._table_column_set.get(table, ()):
         valid.append((table, column))
 
     if not valid:
@@ -482,11 +631,13 @@ class SQLBuilderScreen(Screen): # {{{
     sql, params = result
     app = cast("GazerApp", self.app)
     try:
-      rows = app.db.execute_query_raw(sql, params)
-      rows = [dict(r) for r in rows]
+      # Only the displayed rows are converted; the rest stay in the cursor
+      rows_iter, total = app.db.execute_query_iter(sql, params)
+      rows = list(islice(rows_iter, ResultsScreen.MAX_DISPLAY_ROWS))
+      rows_iter.close()
       self.app.call_from_thread(
         self.app.push_screen,
-        ResultsScreen(sql, params, rows)
+        ResultsScreen(sql, params, rows, total)
       )
     except Exception as e:
       error_msg = f"{type(e).__name__}: {e}"
@@ -502,15 +653,9 @@ class SQLBuilderScreen(Screen): # {{{
     sql, params = result
     app = cast("GazerApp", self.app)
     try:
-      rows = app.db.execute_query_raw(sql, params)
-      if not rows:
-        self.app.call_from_thread(
-          self.show_error, "Export", "Query returned no rows."
-        )
-        return
-      # Convert DictCursor rows to plain dicts
-      rows = [dict(r) for r in rows]
-      self.app.call_from_thread(self.app.push_screen, ExportDialog(rows))
+      # Rows are streamed from the server while the CSV is written
+      rows_iter = app.db.execute_query_stream(sql, params)
+      self.app.call_from_thread(self.app.push_screen, ExportDialog(rows_iter, None))
     except Exception as e:
       error_msg = f"{type(e).__name__}: {e}"
       self.app.call_from_thread(self.show_error, "Export", error_msg)